@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import food_index
+from calorie_calculator import RealCalorieCalculator
+from food_index import FoodIndex, pinyin_initials, split_items
+
+
+def test_suggest_prefix_order_and_limit():
+    index = FoodIndex(["鸡胸肉", "鸡蛋", "鸡", "米饭"])
+    assert index.suggest("鸡") == ["鸡", "鸡蛋", "鸡胸肉"]
+    assert index.suggest("鸡", limit=2) == ["鸡", "鸡蛋"]
+    assert index.suggest("牛") == []
+
+
+def test_suggest_pinyin_initials():
+    index = FoodIndex(["米饭", "面条", "馒头"])
+    assert index.suggest("mf") == ["米饭"]
+    assert sorted(index.suggest("mt")) == ["面条", "馒头"]
+    assert index.suggest("M") == index.suggest("m")
+
+
+def test_gb2312_fallback_initials(monkeypatch):
+    monkeypatch.setattr(food_index, "lazy_pinyin", None)
+    assert pinyin_initials("米饭") == "mf"
+    assert pinyin_initials("胡萝卜") == "hlb"
+    assert pinyin_initials("食用油") == "syy"
+    assert pinyin_initials("A米") == "am"
+
+
+def test_split_items_separators():
+    assert split_items("米饭 200, 鸡蛋 50，番茄100；黄瓜 1、 盐 2;") == [
+        "米饭 200", "鸡蛋 50", "番茄100", "黄瓜 1", "盐 2",
+    ]
+    assert split_items(" , ") == []
+
+
+def test_parse_meal_line():
+    calculator = RealCalorieCalculator()
+    meal = calculator.parse_meal_line("米饭 200克, 鸡蛋 50g，鸡蛋 20, 番茄1.5")
+    assert meal == {"米饭": 200.0, "鸡蛋": 70.0, "番茄": 1.5}
+
+
+def test_parse_meal_line_unknown_and_missing_weight(capsys):
+    calculator = RealCalorieCalculator()
+    assert calculator.parse_meal_line("米饭, 鸡肉 100") == {}
+    output = capsys.readouterr().out
+    assert "缺少重量: 米饭" in output
+    assert "未知食物: 鸡肉" in output
+
+    asked = []
+    meal = calculator.parse_meal_line("米饭, 鸡蛋 50", ask_grams=lambda name: asked.append(name) or 100.0)
+    assert asked == ["米饭"]
+    assert meal == {"米饭": 100.0, "鸡蛋": 50.0}
+
+
+def test_suggest_foods_without_match():
+    calculator = RealCalorieCalculator()
+    assert calculator.suggest_foods("米范") == ["米饭"]
+    assert calculator.suggest_foods("咖啡") == []
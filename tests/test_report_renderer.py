@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+from diet_analyzer import DietAnalyzer
+from report_renderer import ReportWriterPool
+
+
+def _meal(grams):
+    return {
+        "calories": grams, "protein": 0, "fat": 0, "carbs": 0,
+        "foods": [{"name": "米饭", "grams": grams, "calories": grams}],
+    }
+
+
+def test_each_report_written_exactly_once(tmp_path):
+    analyzer = DietAnalyzer()
+    log_path = tmp_path / "calorie_result.txt"
+
+    with ReportWriterPool(workers=4, queue_size=8, batch_size=16) as pool:
+        for i in range(200):
+            result = analyzer.compute_day({"早餐": [{"name": "牛奶", "grams": i}]})
+            pool.submit(tmp_path / f"user_{i}.txt", "day", "text", result)
+            pool.submit(log_path, "meal", "text", _meal(i), append=True)
+
+    assert pool.written == 400
+    assert pool.failed == 0
+    for i in range(200):
+        content = (tmp_path / f"user_{i}.txt").read_text(encoding="utf-8")
+        assert content.count("饮食分析报告") == 1
+        assert f"牛奶: {i}g" in content
+
+    # 追加写入的记录每条一份，且保持提交顺序
+    lines = [line for line in log_path.read_text(encoding="utf-8").splitlines() if line.startswith("米饭")]
+    assert lines == [f"米饭: {i}g = {i:.1f}千卡" for i in range(200)]
+
+
+def test_submit_snapshots_result(tmp_path):
+    meals = {"早餐": [{"name": "牛奶", "grams": 111}]}
+    result = DietAnalyzer().compute_day(meals)
+
+    with ReportWriterPool(workers=1) as pool:
+        pool.submit(tmp_path / "report.txt", "day", "text", result)
+        meals["早餐"][0]["grams"] = 999
+
+    content = (tmp_path / "report.txt").read_text(encoding="utf-8")
+    assert "牛奶: 111g" in content
+
+
+def test_submit_after_close_raises(tmp_path):
+    pool = ReportWriterPool(workers=2, queue_size=2)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.submit(tmp_path / "report.txt", "meal", "text", _meal(1))
+
+
+def test_quiet_bulk_path_and_advice_in_all_formats(tmp_path, capsys):
+    analyzer = DietAnalyzer()
+    meals = {"早餐": [{"name": "牛奶", "grams": 250}]}
+
+    with ReportWriterPool(workers=2) as pool:
+        for fmt in ("text", "markdown", "html"):
+            analyzer.analyze_day(meals, writer=pool, filename=tmp_path / f"report.{fmt}", fmt=fmt, quiet=True)
+    assert capsys.readouterr().out == ""
+
+    for fmt in ("text", "markdown", "html"):
+        content = (tmp_path / f"report.{fmt}").read_text(encoding="utf-8")
+        assert "💡 建议" in content
+        assert "保持均衡饮食" in content
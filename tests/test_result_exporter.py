@@ -0,0 +1,103 @@
+import csv
+import glob
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+from diet_analyzer import DietAnalyzer
+from result_exporter import ResultExporter
+from shopping_list import ShoppingListGenerator
+
+
+def _read_csv(pattern):
+    tables = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8", newline="") as f:
+            tables[path] = list(csv.reader(f))
+    return tables
+
+
+def _meal_row(day, i):
+    return (day, f"user{i}", "午餐", float(i), 1.0, 2.0, 3.0)
+
+
+def test_interleaved_dates_write_full_row_groups(tmp_path):
+    dates = [f"2026-01-{d:02d}" for d in range(1, 31)]
+    exporter = ResultExporter(tmp_path, partition_by_date=True, row_group_size=100, max_buffered_rows=100 * 30)
+    exporter.write_rows("meals", (_meal_row(dates[i % 30], i) for i in range(9000)))
+    writer = exporter.writers["meals"]
+    assert exporter.close() == {"meals": 9000}
+
+    # 每个日期只打开一次文件，每个行组都是满的
+    assert writer.opened == 30
+    assert writer.row_groups == [100] * 90
+    tables = _read_csv(str(tmp_path / "meals" / "date=*" / "*.csv"))
+    assert len(tables) == 30
+    for rows in tables.values():
+        assert rows[0][:3] == ["date", "user_id", "meal_type"]
+        assert len(rows) == 301
+
+
+def test_reopened_partition_appends_without_header(tmp_path):
+    exporter = ResultExporter(tmp_path, partition_by_date=True, row_group_size=1, max_open_partitions=2)
+    dates = ["2026-01-01", "2026-01-02", "2026-01-03"]
+    exporter.write_rows("meals", (_meal_row(dates[i % 3], i) for i in range(30)))
+    writer = exporter.writers["meals"]
+    exporter.close()
+
+    assert writer.opened > 3
+    tables = _read_csv(str(tmp_path / "meals" / "date=*" / "*.csv"))
+    assert len(tables) == 3
+    for rows in tables.values():
+        assert sum(row[0] == "date" for row in rows) == 1
+        assert len(rows) == 11
+
+
+def test_failed_write_keeps_rows_uncounted(tmp_path, monkeypatch):
+    exporter = ResultExporter(tmp_path, row_group_size=1)
+    writer = exporter._writer("meals")
+
+    def fail(partition):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(writer, "_get_sinks", fail)
+    with pytest.raises(OSError):
+        exporter.write_rows("meals", [_meal_row("2026-01-01", 1)])
+    assert writer.row_count == 0
+    assert writer.buffered == 1
+
+
+def test_day_export_carries_user_id(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analyzer = DietAnalyzer()
+    with ResultExporter("export") as exporter:
+        for user_id in ("alice", "bob"):
+            analyzer.analyze_day({"早餐": [{"name": "牛奶", "grams": 250}]}, exporter=exporter,
+                                 day="2026-01-01", user_id=user_id)
+
+    (days,) = _read_csv("export/days/*.csv").values()
+    assert [row[:2] for row in days[1:]] == [["2026-01-01", "alice"], ["2026-01-01", "bob"]]
+
+
+def test_shopping_export_ids_and_prices(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = ShoppingListGenerator()
+    recipes = {"番茄炒蛋": ["鸡蛋 3个", "番茄 2个", "油 15克"], "米饭": ["大米 200克", "水 400毫升"]}
+
+    with ResultExporter("export") as exporter:
+        generator.generate_from_recipes(recipes, exporter=exporter)
+        generator.generate_from_recipes(recipes, exporter=exporter)
+
+    (rows,) = _read_csv("export/shopping_lists/*.csv").values()
+    list_ids = {row[1] for row in rows[1:]}
+    assert len(list_ids) == 2
+
+    # 导出的单项价格之和等于报告里的预估总花费，未分类的食材不计价
+    total_cost = generator.compute_shopping_list(recipes)["total_cost"]
+    for list_id in list_ids:
+        prices = {row[2]: float(row[4]) for row in rows[1:] if row[1] == list_id}
+        assert sum(prices.values()) == pytest.approx(total_cost)
+        assert prices["水"] == 0
@@ -6,6 +6,10 @@ eat-food 真实热量计算器
 
 import json
 import os
+import re
+
+from food_index import FoodIndex, pinyin_initials, split_items
+from report_renderer import render_report
 
 class RealCalorieCalculator:
     def __init__(self):
@@ -47,55 +51,78 @@ class RealCalorieCalculator:
             "白糖": {"calories": 400, "protein": 0, "fat": 0, "carbs": 99.9},
             "盐": {"calories": 0, "protein": 0, "fat": 0, "carbs": 0},
         }
+        
+        # 食物名称索引（前缀和拼音首字母补全）
+        self.index = FoodIndex(self.food_data)
     
-    def calculate_meal(self, meal_items):
-        """计算一餐的营养成分"""
+    def compute_meal(self, meal_items):
+        """计算一餐的营养成分（不输出、不保存）"""
         total = {
             "calories": 0,      # 总热量（千卡）
             "protein": 0,       # 蛋白质（克）
             "fat": 0,           # 脂肪（克）
             "carbs": 0,         # 碳水化合物（克）
-            "foods": []         # 详细记录
+            "foods": [],        # 详细记录
+            "unknown": []       # 未找到数据的食物
         }
         
-        print("\n" + "="*50)
-        print("🍽️  真实热量计算器 - 基于《中国食物成分表》")
-        print("="*50)
-        
         for food_name, grams in meal_items.items():
             food_name = food_name.strip()
             
             # 查找食物（支持中文名）
-            found = False
-            for food_key, nutrients in self.food_data.items():
-                if food_key == food_name:
-                    calories = nutrients["calories"] * grams / 100
-                    protein = nutrients["protein"] * grams / 100
-                    fat = nutrients["fat"] * grams / 100
-                    carbs = nutrients["carbs"] * grams / 100
-                    
-                    total["calories"] += calories
-                    total["protein"] += protein
-                    total["fat"] += fat
-                    total["carbs"] += carbs
-                    
-                    food_info = {
-                        "name": food_name,
-                        "grams": grams,
-                        "calories": round(calories, 1),
-                        "protein": round(protein, 1),
-                        "fat": round(fat, 1),
-                        "carbs": round(carbs, 1)
-                    }
-                    total["foods"].append(food_info)
-                    
-                    print(f"📝 {food_name}: {grams}g")
-                    print(f"   🔥 {calories:.1f}千卡 | 🥚 {protein:.1f}g蛋白 | 🥑 {fat:.1f}g脂肪 | 🍚 {carbs:.1f}g碳水")
-                    found = True
-                    break
+            nutrients = self.food_data.get(food_name)
+            if nutrients is None:
+                total["unknown"].append(food_name)
+                continue
+            
+            calories = nutrients["calories"] * grams / 100
+            protein = nutrients["protein"] * grams / 100
+            fat = nutrients["fat"] * grams / 100
+            carbs = nutrients["carbs"] * grams / 100
+            
+            total["calories"] += calories
+            total["protein"] += protein
+            total["fat"] += fat
+            total["carbs"] += carbs
             
-            if not found:
-                print(f"⚠️  未找到数据: {food_name} (已跳过)")
+            food_info = {
+                "name": food_name,
+                "grams": grams,
+                "calories": round(calories, 1),
+                "protein": round(protein, 1),
+                "fat": round(fat, 1),
+                "carbs": round(carbs, 1)
+            }
+            total["foods"].append(food_info)
+        
+        return total
+    
+    def calculate_meal(self, meal_items, writer=None, filename="calorie_result.txt", quiet=False):
+        """计算一餐的营养成分，传入 writer 时记录交给后台写入，filename 为追加记录的文件，quiet 时不输出到控制台"""
+        total = self.compute_meal(meal_items)
+        
+        if not quiet:
+            self.print_meal(total)
+        
+        # 保存结果
+        if writer is not None:
+            writer.submit(filename, "meal", "text", total, append=True)
+        else:
+            self.save_result(total, filename)
+        return total
+    
+    def print_meal(self, total):
+        """在控制台显示一餐的营养成分"""
+        print("\n" + "="*50)
+        print("🍽️  真实热量计算器 - 基于《中国食物成分表》")
+        print("="*50)
+        
+        for food in total["foods"]:
+            print(f"📝 {food['name']}: {food['grams']}g")
+            print(f"   🔥 {food['calories']:.1f}千卡 | 🥚 {food['protein']:.1f}g蛋白 | 🥑 {food['fat']:.1f}g脂肪 | 🍚 {food['carbs']:.1f}g碳水")
+        
+        for food_name in total["unknown"]:
+            print(f"⚠️  未找到数据: {food_name} (已跳过)")
         
         print("-"*50)
         print("📊 营养总计:")
@@ -132,22 +159,54 @@ class RealCalorieCalculator:
             print("   ⚠️  脂肪摄入偏高，建议减少油炸食品")
         
         print("="*50)
-        
-        # 保存结果
-        self.save_result(total)
-        return total
     
-    def save_result(self, result):
+    def suggest_foods(self, food_name, limit=10):
+        """根据输入前缀给出相近的食物名称，没有匹配时返回空列表"""
+        suggestions = self.index.suggest(food_name, limit)
+        # 没有匹配时按拼音首字母查找（如错别字 '米范' -> 'mf' -> 米饭）
+        if not suggestions:
+            suggestions = self.index.suggest(pinyin_initials(food_name), limit)
+        # 再逐步缩短前缀
+        prefix = food_name
+        while not suggestions and len(prefix) > 1:
+            prefix = prefix[:-1]
+            suggestions = self.index.suggest(prefix, limit)
+        return suggestions
+    
+    def unknown_food_hint(self, food_name):
+        """未知食物的提示信息"""
+        suggestions = self.suggest_foods(food_name)
+        if suggestions:
+            return f"⚠️  未知食物: {food_name}，你是不是要找: {', '.join(suggestions)}"
+        return f"⚠️  未知食物: {food_name}，没有相近的食物（按Tab键查看可用食物）"
+    
+    def parse_meal_line(self, line, ask_grams=None):
+        """解析一行多个食物，如：'米饭 200, 鸡蛋 50' -> {'米饭': 200.0, '鸡蛋': 50.0}，没写重量的用 ask_grams(食物名) 询问"""
+        meal = {}
+        for item in split_items(line):
+            match = re.match(r'^(.+?)\s*(\d*\.?\d+)?\s*(?:g|克)?$', item)
+            food_name = match.group(1).strip()
+            if food_name not in self.food_data:
+                print(self.unknown_food_hint(food_name))
+                continue
+            
+            if match.group(2) is not None:
+                grams = float(match.group(2))
+            elif ask_grams is not None:
+                grams = ask_grams(food_name)
+            else:
+                print(f"⚠️  缺少重量: {item}（示例: 米饭 200）")
+                continue
+            
+            meal[food_name] = meal.get(food_name, 0) + grams
+        return meal
+    
+    def save_result(self, result, filename="calorie_result.txt"):
         """保存计算结果到文件"""
         try:
-            with open("calorie_result.txt", "a", encoding="utf-8") as f:
-                from datetime import datetime
-                f.write(f"\n{'='*40}\n")
-                f.write(f"记录时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
-                f.write(f"总热量: {result['calories']:.1f}千卡\n")
-                for food in result["foods"]:
-                    f.write(f"{food['name']}: {food['grams']}g = {food['calories']:.1f}千卡\n")
-            print("💾 结果已保存到 calorie_result.txt")
+            with open(filename, "a", encoding="utf-8") as f:
+                f.write(render_report("meal", "text", result))
+            print(f"💾 结果已保存到 {filename}")
         except:
             print("💾 结果保存失败")
 
@@ -167,20 +226,21 @@ def main():
     calculator.calculate_meal(lunch)
     
     # 交互模式
-    print("\n🎮 开始自定义计算（输入'q'退出）")
+    calculator.index.enable_readline()
+    print("\n🎮 开始自定义计算（输入'q'退出，Tab键补全，支持拼音首字母）")
+    print("可一次输入多个食物，如: 米饭 200, 鸡蛋 50")
     while True:
         try:
             food = input("\n请输入食物名称（中文）: ").strip()
             if food.lower() == 'q':
                 break
             
-            if food not in calculator.food_data:
-                print(f"⚠️  未知食物，可用食物: {', '.join(list(calculator.food_data.keys())[:10])}...")
-                continue
-            
-            grams = float(input(f"请输入{food}的重量(克): "))
-            
-            calculator.calculate_meal({food: grams})
+            # 一行一个或多个食物，缺少的重量逐个询问，一次算完
+            meal = calculator.parse_meal_line(
+                food, ask_grams=lambda name: float(input(f"请输入{name}的重量(克): "))
+            )
+            if meal:
+                calculator.calculate_meal(meal)
             
         except ValueError:
             print("⚠️  请输入有效的数字")
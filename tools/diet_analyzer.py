@@ -7,6 +7,8 @@
 import json
 from datetime import datetime, timedelta
 
+from report_renderer import FILE_EXTENSIONS, render_report
+
 class DietAnalyzer:
     def __init__(self):
         # 中国居民膳食营养素参考摄入量（成人）
@@ -34,24 +36,17 @@ class DietAnalyzer:
             "菠菜": {"calories": 28, "protein": 2.6, "fat": 0.3, "carbs": 4.5, "fiber": 1.7, "iron": 2.9, "vitamin_c": 32},
         }
     
-    def analyze_day(self, meals):
-        """分析一天的饮食"""
+    def compute_day(self, meals):
+        """计算一天的营养数据（不输出、不保存），批量生成报告时配合 ReportWriterPool.submit 使用"""
         daily_total = {
             "calories": 0, "protein": 0, "fat": 0, "carbs": 0,
             "fiber": 0, "calcium": 0, "iron": 0, "vitamin_c": 0
         }
         
-        print("\n" + "="*60)
-        print("📊 饮食分析报告")
-        print("="*60)
-        
-        # 分析每餐
+        # 计算每餐
         meal_results = {}
         for meal_type, meal_items in meals.items():
-            print(f"\n🍽️  {meal_type}:")
-            print("-"*40)
-            
-            meal_total = {"calories": 0, "protein": 0, "fat": 0, "carbs": 0}
+            meal_total = {"calories": 0, "protein": 0, "fat": 0, "carbs": 0, "foods": []}
             
             for food_item in meal_items:
                 food_name = food_item.get("name", "")
@@ -85,12 +80,65 @@ class DietAnalyzer:
                     daily_total["iron"] += iron
                     daily_total["vitamin_c"] += vitamin_c
                     
-                    print(f"  {food_name}: {grams}g")
-                    print(f"    → {calories:.0f}千卡")
+                    meal_total["foods"].append({"name": food_name, "grams": grams, "calories": calories})
                 else:
-                    print(f"  ⚠️  {food_name}: 营养数据未知")
+                    # 营养数据未知
+                    meal_total["foods"].append({"name": food_name, "grams": grams, "calories": None})
             
             meal_results[meal_type] = meal_total
+        
+        return {
+            "meals": meals,
+            "meal_results": meal_results,
+            "daily_total": daily_total,
+            "score": self.calculate_health_score(daily_total),
+        }
+    
+    def analyze_day(self, meals, exporter=None, day=None, writer=None, filename=None, fmt="text", user_id="", quiet=False):
+        """分析一天的饮食；exporter 按 user_id 导出每餐和全天结果，writer 后台写报告，filename 指定报告路径（默认按日期命名），quiet 时不输出到控制台"""
+        result = self.compute_day(meals)
+        daily_total = result["daily_total"]
+        meal_results = result["meal_results"]
+        score = result["score"]
+        
+        if not quiet:
+            self.print_day(result)
+        
+        # 保存报告
+        if writer is not None:
+            writer.submit(filename or self.report_filename(fmt), "day", fmt, result)
+        else:
+            self.save_report(daily_total, meals, score, fmt, filename)
+        
+        # 批量导出
+        if exporter is not None:
+            for meal_type, meal_total in meal_results.items():
+                exporter.add_meal(day, meal_type, meal_total, user_id)
+            exporter.add_day(day, daily_total, score, user_id)
+        
+        return daily_total
+    
+    def print_day(self, result):
+        """在控制台显示饮食分析报告"""
+        daily_total = result["daily_total"]
+        meal_results = result["meal_results"]
+        score = result["score"]
+        
+        print("\n" + "="*60)
+        print("📊 饮食分析报告")
+        print("="*60)
+        
+        # 显示每餐
+        for meal_type, meal_total in meal_results.items():
+            print(f"\n🍽️  {meal_type}:")
+            print("-"*40)
+            
+            for food in meal_total["foods"]:
+                if food["calories"] is not None:
+                    print(f"  {food['name']}: {food['grams']}g")
+                    print(f"    → {food['calories']:.0f}千卡")
+                else:
+                    print(f"  ⚠️  {food['name']}: 营养数据未知")
             
             # 显示每餐总计
             print(f"\n  📈 本餐总计:")
@@ -145,16 +193,10 @@ class DietAnalyzer:
         print(f"   维生素C: {daily_total['vitamin_c']:.0f}mg （推荐: {self.daily_reference['vitamin_c']}mg）")
         
         # 健康评分
-        score = self.calculate_health_score(daily_total)
         print(f"\n⭐ 健康评分: {score}/100")
         
         # 建议
         self.give_recommendations(daily_total)
-        
-        # 保存报告
-        self.save_report(daily_total, meals, score)
-        
-        return daily_total
     
     def calculate_health_score(self, nutrients):
         """计算饮食健康评分"""
@@ -201,43 +243,18 @@ class DietAnalyzer:
         if nutrients['fiber'] < self.daily_reference['fiber']:
             print("   🔼 膳食纤维不足，建议增加蔬菜、水果、全谷物")
     
-    def save_report(self, nutrients, meals, score):
+    def report_filename(self, fmt="text"):
+        """按日期生成报告文件名"""
+        return f"diet_report_{datetime.now().strftime('%Y%m%d')}.{FILE_EXTENSIONS[fmt]}"
+    
+    def save_report(self, nutrients, meals, score, fmt="text", filename=None):
         """保存分析报告"""
         try:
-            filename = f"diet_report_{datetime.now().strftime('%Y%m%d')}.txt"
+            filename = filename or self.report_filename(fmt)
+            content = render_report("day", fmt, {"meals": meals, "daily_total": nutrients, "score": score})
             
             with open(filename, "w", encoding="utf-8") as f:
-                f.write("="*60 + "\n")
-                f.write("📊 饮食分析报告\n")
-                f.write("="*60 + "\n\n")
-                f.write(f"分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
-                
-                f.write("🍽️ 三餐记录:\n")
-                for meal_type, meal_items in meals.items():
-                    f.write(f"\n{meal_type}:\n")
-                    for item in meal_items:
-                        f.write(f"  • {item.get('name')}: {item.get('grams')}g\n")
-                
-                f.write("\n" + "="*60 + "\n")
-                f.write("📈 营养分析:\n")
-                f.write("-"*60 + "\n")
-                
-                f.write(f"总热量: {nutrients['calories']:.0f}千卡\n")
-                f.write(f"蛋白质: {nutrients['protein']:.1f}g\n")
-                f.write(f"脂肪: {nutrients['fat']:.1f}g\n")
-                f.write(f"碳水: {nutrients['carbs']:.1f}g\n")
-                f.write(f"膳食纤维: {nutrients['fiber']:.1f}g\n")
-                f.write(f"钙: {nutrients['calcium']:.0f}mg\n")
-                f.write(f"铁: {nutrients['iron']:.1f}mg\n")
-                f.write(f"维生素C: {nutrients['vitamin_c']:.0f}mg\n\n")
-                
-                f.write(f"健康评分: {score}/100\n")
-                
-                f.write("\n💡 建议:\n")
-                # 这里可以添加具体的建议内容
-                f.write("保持均衡饮食，多吃蔬菜水果，适量摄入蛋白质\n")
-                
-                f.write("="*60 + "\n")
+                f.write(content)
             
             print(f"💾 报告已保存到: {filename}")
         except Exception as e:
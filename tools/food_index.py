@@ -0,0 +1,149 @@
+#!python
+"""
+食物名称前缀索引
+支持中文前缀和拼音首字母（如 'mf' -> 米饭）的自动补全
+"""
+
+import json
+import os
+import re
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# GB2312一级汉字按拼音排序，可以用编码区间推算首字母
+GB2312_INITIALS = [
+    (0xB0A1, "a"), (0xB0C5, "b"), (0xB2C1, "c"), (0xB4EE, "d"), (0xB6EA, "e"),
+    (0xB7A2, "f"), (0xB8C1, "g"), (0xB9FE, "h"), (0xBBF7, "j"), (0xBFA6, "k"),
+    (0xC0AC, "l"), (0xC2E8, "m"), (0xC4C3, "n"), (0xC5B6, "o"), (0xC5BE, "p"),
+    (0xC6DA, "q"), (0xC8BB, "r"), (0xC8F6, "s"), (0xCBFA, "t"), (0xCDDA, "w"),
+    (0xCEF4, "x"), (0xD1B9, "y"), (0xD4D1, "z"), (0xD7FA, None),
+]
+
+# 共享的食物数据文件
+FOOD_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "food_data", "chinese_foods.json")
+
+# 多个食物之间的分隔符：逗号、分号（中英文）
+ITEM_SEPARATORS = re.compile(r'[,，;；、]')
+
+
+def pinyin_initials(name):
+    """获取名称的拼音首字母，如：'米饭' -> 'mf'"""
+    if lazy_pinyin is not None:
+        return "".join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower()
+
+    initials = []
+    for char in name:
+        if char.isascii():
+            initials.append(char.lower())
+            continue
+        try:
+            encoded = char.encode("gb2312")
+        except UnicodeEncodeError:
+            initials.append(char)
+            continue
+        code = (encoded[0] << 8) + encoded[1] if len(encoded) == 2 else 0
+        letter = char  # 二级汉字不按拼音排序，保留原字
+        for (start, initial), (end, _) in zip(GB2312_INITIALS, GB2312_INITIALS[1:]):
+            if start <= code < end:
+                letter = initial
+                break
+        initials.append(letter)
+    return "".join(initials)
+
+
+def load_food_names(path=FOOD_DATA_PATH):
+    """读取 food_data 中的全部食物名称，文件不存在时返回空列表"""
+    try:
+        with open(path, encoding="utf-8-sig") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [food["name"] for foods in data.get("foods", {}).values() for food in foods]
+
+
+def split_items(line):
+    """把一行输入拆成多个食物，如：'米饭 200, 鸡蛋 50' -> ['米饭 200', '鸡蛋 50']"""
+    return [part.strip() for part in ITEM_SEPARATORS.split(line) if part.strip()]
+
+
+class _TrieNode:
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children = {}
+        self.names = []     # 以该节点结尾的食物名
+
+
+class FoodIndex:
+    def __init__(self, names=()):
+        self.root = _TrieNode()
+        self.names = set()
+        self.add_all(names)
+
+    def _insert(self, key, name):
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        if name not in node.names:
+            node.names.append(name)
+
+    def add(self, name):
+        """添加食物名称（同时索引中文和拼音首字母）"""
+        name = name.strip()
+        if not name or name in self.names:
+            return
+        self.names.add(name)
+        self._insert(name.lower(), name)
+        initials = pinyin_initials(name)
+        if initials != name:
+            self._insert(initials, name)
+
+    def add_all(self, names):
+        for name in names:
+            self.add(name)
+
+    def suggest(self, prefix, limit=10):
+        """按前缀查找食物名称，短名称优先"""
+        node = self.root
+        for char in prefix.strip().lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        # 按层遍历，找到足够数量就停止
+        results = []
+        level = [node]
+        while level and len(results) < limit:
+            next_level = []
+            for current in level:
+                if len(results) >= limit:
+                    break
+                for name in current.names:
+                    if name not in results:
+                        results.append(name)
+                next_level.extend(current.children.values())
+            level = next_level
+        return results[:limit]
+
+    def completer(self, text, state):
+        """readline 补全函数"""
+        if state == 0:
+            self._matches = self.suggest(text, limit=50) if text else []
+        return self._matches[state] if state < len(self._matches) else None
+
+    def enable_readline(self):
+        """启用Tab补全，不支持readline的平台直接跳过"""
+        try:
+            import readline
+        except ImportError:
+            return False
+        readline.set_completer(self.completer)
+        readline.set_completer_delims(" \t\n,，;；、")
+        readline.parse_and_bind("tab: complete")
+        return True
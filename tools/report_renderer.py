@@ -0,0 +1,335 @@
+#!python
+"""
+报告模板渲染与后台写入
+把结构化的分析结果渲染成文本/Markdown/HTML报告，由后台线程批量写入文件
+
+批量生成报告时不要调用 analyze_day（会逐条输出到控制台），直接计算后提交：
+
+    with ReportWriterPool() as pool:
+        for user_id, meals in users.items():
+            pool.submit(f"reports/{user_id}.html", "day", "html", analyzer.compute_day(meals))
+"""
+
+import html
+import os
+import queue
+import threading
+import zlib
+from datetime import datetime
+
+
+class ReportTemplate:
+    """报告模板：正文是 str.format 格式串，列表字段由子模板逐行渲染后拼接"""
+
+    def __init__(self, body, escape=False, **sections):
+        self.body = body
+        self.escape = escape        # HTML模板需要转义文本
+        self.sections = sections    # 字段名 -> 子模板
+
+    def render(self, context):
+        values = {}
+        for key, value in context.items():
+            section = self.sections.get(key)
+            if section is not None:
+                values[key] = "".join([section.render(row) for row in value])
+            elif self.escape and isinstance(value, str):
+                values[key] = html.escape(value)
+            else:
+                values[key] = value
+        return self.body.format_map(values)
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M')
+
+
+def _day_context(result):
+    """饮食分析结果 -> 模板字段"""
+    context = dict(result["daily_total"])
+    context["time"] = result.get("time") or _now()
+    context["score"] = result["score"]
+    context["meals"] = [
+        {
+            "meal_type": meal_type,
+            "items": [{"name": item.get("name"), "grams": item.get("grams")} for item in meal_items],
+        }
+        for meal_type, meal_items in result["meals"].items()
+    ]
+    return context
+
+
+def _meal_context(result):
+    """热量计算结果 -> 模板字段"""
+    return {
+        "time": result.get("time") or _now(),
+        "calories": result["calories"],
+        "protein": result["protein"],
+        "fat": result["fat"],
+        "carbs": result["carbs"],
+        "foods": [dict(food) for food in result["foods"]],
+    }
+
+
+def _shopping_context(result):
+    """购物清单结果 -> 模板字段"""
+    return {
+        "time": result.get("time") or _now(),
+        "recipes": [{"name": name} for name in result["recipes"]],
+        "items": [dict(item) for item in result["items"]],
+        "total_cost": result["total_cost"],
+    }
+
+
+CONTEXT_BUILDERS = {
+    "day": _day_context,
+    "meal": _meal_context,
+    "shopping": _shopping_context,
+}
+
+# 模板在导入时构建一次，渲染时只做 format_map 和 join
+TEMPLATES = {
+    # 饮食分析报告
+    ("day", "text"): ReportTemplate(
+        "=" * 60 + "\n📊 饮食分析报告\n" + "=" * 60 + "\n\n"
+        "分析时间: {time}\n\n"
+        "🍽️ 三餐记录:\n{meals}\n"
+        + "=" * 60 + "\n📈 营养分析:\n" + "-" * 60 + "\n"
+        "总热量: {calories:.0f}千卡\n"
+        "蛋白质: {protein:.1f}g\n"
+        "脂肪: {fat:.1f}g\n"
+        "碳水: {carbs:.1f}g\n"
+        "膳食纤维: {fiber:.1f}g\n"
+        "钙: {calcium:.0f}mg\n"
+        "铁: {iron:.1f}mg\n"
+        "维生素C: {vitamin_c:.0f}mg\n\n"
+        "健康评分: {score}/100\n"
+        "\n💡 建议:\n"
+        "保持均衡饮食，多吃蔬菜水果，适量摄入蛋白质\n"
+        + "=" * 60 + "\n",
+        meals=ReportTemplate(
+            "\n{meal_type}:\n{items}",
+            items=ReportTemplate("  • {name}: {grams}g\n"),
+        ),
+    ),
+    ("day", "markdown"): ReportTemplate(
+        "# 📊 饮食分析报告\n\n"
+        "分析时间: {time}\n\n"
+        "## 🍽️ 三餐记录\n{meals}\n"
+        "## 📈 营养分析\n\n"
+        "| 营养素 | 摄入量 |\n|---|---|\n"
+        "| 总热量 | {calories:.0f}千卡 |\n"
+        "| 蛋白质 | {protein:.1f}g |\n"
+        "| 脂肪 | {fat:.1f}g |\n"
+        "| 碳水 | {carbs:.1f}g |\n"
+        "| 膳食纤维 | {fiber:.1f}g |\n"
+        "| 钙 | {calcium:.0f}mg |\n"
+        "| 铁 | {iron:.1f}mg |\n"
+        "| 维生素C | {vitamin_c:.0f}mg |\n\n"
+        "**健康评分: {score}/100**\n\n"
+        "## 💡 建议\n\n"
+        "保持均衡饮食，多吃蔬菜水果，适量摄入蛋白质\n",
+        meals=ReportTemplate(
+            "\n### {meal_type}\n\n{items}",
+            items=ReportTemplate("- {name}: {grams}g\n"),
+        ),
+    ),
+    ("day", "html"): ReportTemplate(
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>饮食分析报告</title></head><body>\n"
+        "<h1>📊 饮食分析报告</h1>\n"
+        "<p>分析时间: {time}</p>\n"
+        "<h2>🍽️ 三餐记录</h2>\n{meals}"
+        "<h2>📈 营养分析</h2>\n<table>\n"
+        "<tr><td>总热量</td><td>{calories:.0f}千卡</td></tr>\n"
+        "<tr><td>蛋白质</td><td>{protein:.1f}g</td></tr>\n"
+        "<tr><td>脂肪</td><td>{fat:.1f}g</td></tr>\n"
+        "<tr><td>碳水</td><td>{carbs:.1f}g</td></tr>\n"
+        "<tr><td>膳食纤维</td><td>{fiber:.1f}g</td></tr>\n"
+        "<tr><td>钙</td><td>{calcium:.0f}mg</td></tr>\n"
+        "<tr><td>铁</td><td>{iron:.1f}mg</td></tr>\n"
+        "<tr><td>维生素C</td><td>{vitamin_c:.0f}mg</td></tr>\n"
+        "</table>\n<p><strong>健康评分: {score}/100</strong></p>\n"
+        "<h2>💡 建议</h2>\n<p>保持均衡饮食，多吃蔬菜水果，适量摄入蛋白质</p>\n</body></html>\n",
+        escape=True,
+        meals=ReportTemplate(
+            "<h3>{meal_type}</h3>\n<ul>\n{items}</ul>\n",
+            escape=True,
+            items=ReportTemplate("<li>{name}: {grams}g</li>\n", escape=True),
+        ),
+    ),
+
+    # 热量计算记录
+    ("meal", "text"): ReportTemplate(
+        "\n" + "=" * 40 + "\n"
+        "记录时间: {time}\n"
+        "总热量: {calories:.1f}千卡\n{foods}",
+        foods=ReportTemplate("{name}: {grams}g = {calories:.1f}千卡\n"),
+    ),
+    ("meal", "markdown"): ReportTemplate(
+        "## 🍽️ 热量记录 {time}\n\n"
+        "| 食物 | 重量 | 热量 | 蛋白质 | 脂肪 | 碳水 |\n|---|---|---|---|---|---|\n{foods}"
+        "| **总计** | | **{calories:.1f}千卡** | {protein:.1f}g | {fat:.1f}g | {carbs:.1f}g |\n",
+        foods=ReportTemplate(
+            "| {name} | {grams}g | {calories:.1f}千卡 | {protein:.1f}g | {fat:.1f}g | {carbs:.1f}g |\n"
+        ),
+    ),
+    ("meal", "html"): ReportTemplate(
+        "<h2>🍽️ 热量记录 {time}</h2>\n<table>\n"
+        "<tr><th>食物</th><th>重量</th><th>热量</th><th>蛋白质</th><th>脂肪</th><th>碳水</th></tr>\n{foods}"
+        "<tr><th>总计</th><td></td><td>{calories:.1f}千卡</td><td>{protein:.1f}g</td>"
+        "<td>{fat:.1f}g</td><td>{carbs:.1f}g</td></tr>\n</table>\n",
+        escape=True,
+        foods=ReportTemplate(
+            "<tr><td>{name}</td><td>{grams}g</td><td>{calories:.1f}千卡</td><td>{protein:.1f}g</td>"
+            "<td>{fat:.1f}g</td><td>{carbs:.1f}g</td></tr>\n",
+            escape=True,
+        ),
+    ),
+
+    # 购物清单
+    ("shopping", "text"): ReportTemplate(
+        "=" * 50 + "\n🛒 购物清单\n" + "=" * 50 + "\n\n"
+        "生成时间: {time}\n\n"
+        "📝 菜谱:\n{recipes}"
+        "\n📋 需要购买:\n{items}"
+        "\n💰 预估总花费: {total_cost:.2f}元\n"
+        + "=" * 50 + "\n",
+        recipes=ReportTemplate("  • {name}\n"),
+        items=ReportTemplate("  ✓ {name}: {amount}\n"),
+    ),
+    ("shopping", "markdown"): ReportTemplate(
+        "# 🛒 购物清单\n\n"
+        "生成时间: {time}\n\n"
+        "## 📝 菜谱\n\n{recipes}"
+        "\n## 📋 需要购买\n\n{items}"
+        "\n**💰 预估总花费: {total_cost:.2f}元**\n",
+        recipes=ReportTemplate("- {name}\n"),
+        items=ReportTemplate("- [ ] {name}: {amount}\n"),
+    ),
+    ("shopping", "html"): ReportTemplate(
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>购物清单</title></head><body>\n"
+        "<h1>🛒 购物清单</h1>\n"
+        "<p>生成时间: {time}</p>\n"
+        "<h2>📝 菜谱</h2>\n<ul>\n{recipes}</ul>\n"
+        "<h2>📋 需要购买</h2>\n<ul>\n{items}</ul>\n"
+        "<p><strong>💰 预估总花费: {total_cost:.2f}元</strong></p>\n</body></html>\n",
+        escape=True,
+        recipes=ReportTemplate("<li>{name}</li>\n", escape=True),
+        items=ReportTemplate("<li>{name}: {amount}</li>\n", escape=True),
+    ),
+}
+
+FILE_EXTENSIONS = {"text": "txt", "markdown": "md", "html": "html"}
+
+
+def build_context(kind, result):
+    """提取渲染所需的数据快照，之后修改 result 不会影响报告"""
+    builder = CONTEXT_BUILDERS.get(kind)
+    if builder is None:
+        raise ValueError(f"不支持的报告类型: {kind}")
+    return builder(result)
+
+
+def get_template(kind, fmt):
+    template = TEMPLATES.get((kind, fmt))
+    if template is None:
+        raise ValueError(f"不支持的报告: {kind}/{fmt}")
+    return template
+
+
+def render_report(kind, fmt, result):
+    """按报告类型（day/meal/shopping）和格式（text/markdown/html）渲染报告"""
+    return get_template(kind, fmt).render(build_context(kind, result))
+
+
+class ReportWriterPool:
+    """后台报告写入：每个线程一个有界队列，同一文件固定交给同一线程按提交顺序写入"""
+
+    def __init__(self, workers=2, queue_size=1024, batch_size=64):
+        self.queues = [queue.Queue(maxsize=max(1, queue_size // workers)) for _ in range(workers)]
+        self.batch_size = batch_size
+        self.closed = False
+        self.written = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._run, args=(q,), daemon=True) for q in self.queues]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, path, kind, fmt, result, append=False):
+        """提交一份报告：立即生成数据快照（含时间），队列满时阻塞；非追加模式下同一路径以最后一次提交为准"""
+        if self.closed:
+            raise RuntimeError("报告写入池已关闭")
+        template = get_template(kind, fmt)
+        context = build_context(kind, result)
+        path = os.fspath(path)
+        worker_queue = self.queues[zlib.crc32(path.encode("utf-8")) % len(self.queues)]
+        worker_queue.put((path, template, context, append))
+
+    def _run(self, worker_queue):
+        while True:
+            task = worker_queue.get()
+            if task is None:
+                return
+
+            # 尽量多取几份报告，一起渲染写入
+            batch = [task]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    task = worker_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    stop = True
+                    break
+                batch.append(task)
+
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        # 只合并连续的、追加写入同一文件的报告；覆盖写入的报告逐份写
+        writes = []
+        written = failed = 0
+        for path, template, context, append in batch:
+            try:
+                content = template.render(context)
+            except Exception as e:
+                print(f"💾 渲染失败: {path}: {e}")
+                failed += 1
+                continue
+            if append and writes and writes[-1][0] == path and writes[-1][1]:
+                writes[-1][2].append(content)
+            else:
+                writes.append((path, append, [content]))
+
+        for path, append, parts in writes:
+            try:
+                with open(path, "a" if append else "w", encoding="utf-8") as f:
+                    f.write("".join(parts))
+                written += len(parts)
+            except Exception as e:
+                print(f"💾 保存失败: {path}: {e}")
+                failed += len(parts)
+
+        with self._lock:
+            self.written += written
+            self.failed += failed
+
+    def close(self):
+        """等待队列中的报告全部写完，之后不能再提交"""
+        if self.closed:
+            return self.written
+        self.closed = True
+        for worker_queue in self.queues:
+            worker_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        return self.written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,328 @@
+#!python
+"""
+分析结果批量导出器
+将每餐、每日、购物清单结果流式写入列式文件（CSV，可选Parquet/Arrow）
+"""
+
+import csv
+import os
+import sys
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# 各表的列定义：(列名, 类型)
+TABLE_SCHEMAS = {
+    "meals": [
+        ("date", "str"), ("user_id", "str"), ("meal_type", "str"),
+        ("calories", "float"), ("protein", "float"), ("fat", "float"), ("carbs", "float"),
+    ],
+    "days": [
+        ("date", "str"), ("user_id", "str"),
+        ("calories", "float"), ("protein", "float"), ("fat", "float"), ("carbs", "float"),
+        ("fiber", "float"), ("calcium", "float"), ("iron", "float"), ("vitamin_c", "float"),
+        ("score", "int"),
+    ],
+    "shopping_lists": [
+        ("date", "str"), ("list_id", "str"), ("item", "str"),
+        ("grams", "float"), ("estimated_price", "float"),
+    ],
+}
+
+FILE_EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrow"}
+
+
+def _format_date(value):
+    """统一日期格式为 YYYY-MM-DD"""
+    if value is None:
+        return datetime.now().strftime('%Y-%m-%d')
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+class _TableWriter:
+    """单张表的缓冲写入器，每个分区攒满一个行组后落盘"""
+
+    def __init__(self, output_dir, table, formats, row_group_size, partition_by_date, run_id,
+                 max_open_partitions, max_buffered_rows):
+        self.output_dir = output_dir
+        self.table = table
+        self.columns = TABLE_SCHEMAS[table]
+        self.formats = formats
+        self.row_group_size = row_group_size
+        self.partition_by_date = partition_by_date
+        self.run_id = run_id
+        self.max_open_partitions = max_open_partitions
+        self.max_buffered_rows = max_buffered_rows
+        self.buffers = {}               # 分区 -> 待写入的行
+        self.buffered = 0               # 所有分区缓冲的总行数
+        self.sinks = OrderedDict()      # 已打开的分区 -> {格式: 写入器}，按最近使用排序
+        self.csv_started = set()        # 已写过CSV表头的分区
+        self.part_numbers = {}          # 分区 -> 已创建的列式文件数
+        self.row_count = 0
+        self.opened = 0                 # 打开分区文件的次数
+        self.row_groups = []            # 每个写出的行组的行数
+
+        if pa is not None:
+            type_map = {"str": pa.string(), "float": pa.float64(), "int": pa.int64()}
+            self.schema = pa.schema([(name, type_map[kind]) for name, kind in self.columns])
+
+    def write(self, row):
+        partition = row[0] if self.partition_by_date else None
+        buffer = self.buffers.get(partition)
+        if buffer is None:
+            buffer = self.buffers[partition] = []
+        buffer.append(row)
+        self.buffered += 1
+
+        if len(buffer) >= self.row_group_size:
+            self._flush_partition(partition)
+        elif self.buffered >= self.max_buffered_rows:
+            self._flush_largest()
+
+    def _flush_largest(self):
+        """缓冲总量超限时写出最大的分区；打开的文件数已满时，已打开分区的行数不少于一半就优先写它，避免反复关闭重开"""
+        size = lambda key: len(self.buffers[key])
+        largest = max(self.buffers, key=size)
+        if largest not in self.sinks and len(self.sinks) >= self.max_open_partitions:
+            open_partitions = [key for key in self.buffers if key in self.sinks]
+            if open_partitions:
+                largest_open = max(open_partitions, key=size)
+                if size(largest_open) * 2 >= size(largest):
+                    largest = largest_open
+        self._flush_partition(largest)
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        """把所有分区的缓冲写入文件"""
+        for partition in list(self.buffers):
+            self._flush_partition(partition)
+
+    def _flush_partition(self, partition):
+        # 写入成功后才移出缓冲并计数
+        rows = self.buffers[partition]
+        sinks = self._get_sinks(partition)
+        if "csv" in sinks:
+            sinks["csv"][1].writerows(rows)
+        if "parquet" in sinks or "arrow" in sinks:
+            columns = list(zip(*rows))
+            batch = pa.record_batch(
+                [pa.array(col, type=field.type) for col, field in zip(columns, self.schema)],
+                schema=self.schema,
+            )
+            if "parquet" in sinks:
+                sinks["parquet"].write_batch(batch)
+            if "arrow" in sinks:
+                sinks["arrow"][1].write_batch(batch)
+
+        del self.buffers[partition]
+        self.buffered -= len(rows)
+        self.row_count += len(rows)
+        self.row_groups.append(len(rows))
+
+    def _get_sinks(self, partition):
+        """按需打开分区对应的文件，超过上限时关闭最久未用的分区"""
+        if partition in self.sinks:
+            self.sinks.move_to_end(partition)
+            return self.sinks[partition]
+
+        while len(self.sinks) >= self.max_open_partitions:
+            _, oldest = self.sinks.popitem(last=False)
+            self._close_sinks(oldest)
+
+        directory = os.path.join(self.output_dir, self.table)
+        if partition is not None:
+            directory = os.path.join(directory, f"date={partition}")
+        os.makedirs(directory, exist_ok=True)
+
+        # CSV重新打开时追加写入；Parquet/Arrow不能追加，另起一个文件
+        part_number = self.part_numbers.get(partition, 0)
+        suffix = f"-{part_number}" if part_number else ""
+
+        sinks = {}
+        try:
+            for fmt in self.formats:
+                if fmt == "csv":
+                    path = os.path.join(directory, f"part-{self.run_id}.csv")
+                    started = partition in self.csv_started
+                    f = open(path, "a" if started else "w", encoding="utf-8", newline="", buffering=1 << 18)
+                    writer = csv.writer(f)
+                    sinks["csv"] = (f, writer)
+                    if not started:
+                        writer.writerow([name for name, _ in self.columns])
+                        self.csv_started.add(partition)
+                    continue
+
+                path = os.path.join(directory, f"part-{self.run_id}{suffix}.{FILE_EXTENSIONS[fmt]}")
+                if fmt == "parquet":
+                    sinks["parquet"] = pq.ParquetWriter(path, self.schema)
+                elif fmt == "arrow":
+                    sink = pa.OSFile(path, "wb")
+                    sinks["arrow"] = (sink, None)  # new_file 失败时也能关闭文件
+                    sinks["arrow"] = (sink, pa_ipc.new_file(sink, self.schema))
+        except Exception:
+            self._close_sinks(sinks)
+            raise
+
+        self.part_numbers[partition] = part_number + 1
+        self.opened += 1
+        self.sinks[partition] = sinks
+        return sinks
+
+    def _close_sinks(self, sinks):
+        if "csv" in sinks:
+            sinks["csv"][0].close()
+        if "parquet" in sinks:
+            sinks["parquet"].close()
+        if "arrow" in sinks:
+            if sinks["arrow"][1] is not None:
+                sinks["arrow"][1].close()
+            sinks["arrow"][0].close()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            # 出错时也要关闭已打开的文件
+            while self.sinks:
+                _, sinks = self.sinks.popitem(last=False)
+                self._close_sinks(sinks)
+
+
+class ResultExporter:
+    def __init__(self, output_dir="export", formats=("csv",), row_group_size=65536, partition_by_date=False,
+                 max_open_partitions=32, max_buffered_rows=None):
+        # CSV总是导出，Parquet/Arrow需要安装pyarrow
+        formats = ["csv"] + [fmt for fmt in formats if fmt != "csv"]
+        for fmt in formats:
+            if fmt not in FILE_EXTENSIONS:
+                raise ValueError(f"不支持的导出格式: {fmt}")
+        if pa is None and len(formats) > 1:
+            print("⚠️  未安装pyarrow，仅导出CSV")
+            formats = ["csv"]
+
+        self.output_dir = output_dir
+        self.formats = formats
+        self.row_group_size = row_group_size
+        self.partition_by_date = partition_by_date
+        # 同时打开的分区数和缓冲总行数都有上限，内存占用不随日期数增长；
+        # 默认能同时打开一个月的日期。多个日期交错写入时，要让每个行组都写满，
+        # max_buffered_rows 需不小于 row_group_size × 日期数
+        self.max_open_partitions = max_open_partitions
+        self.max_buffered_rows = max_buffered_rows or row_group_size * 8
+        # 每次导出使用独立的文件名，避免覆盖之前的结果
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+        self.writers = {}
+
+    def _writer(self, table):
+        if table not in self.writers:
+            self.writers[table] = _TableWriter(
+                self.output_dir, table, self.formats, self.row_group_size,
+                self.partition_by_date, self.run_id,
+                self.max_open_partitions, self.max_buffered_rows,
+            )
+        return self.writers[table]
+
+    def write_rows(self, table, rows):
+        """批量写入原始行（元组顺序与 TABLE_SCHEMAS 一致）"""
+        self._writer(table).write_many(rows)
+
+    def add_meal(self, day, meal_type, meal_total, user_id=""):
+        """记录一餐的营养汇总，user_id 用于区分不同用户"""
+        self._writer("meals").write((
+            _format_date(day), str(user_id), meal_type,
+            meal_total.get("calories", 0), meal_total.get("protein", 0),
+            meal_total.get("fat", 0), meal_total.get("carbs", 0),
+        ))
+
+    def add_day(self, day, daily_total, score, user_id=""):
+        """记录一天的营养汇总和健康评分，user_id 用于区分不同用户"""
+        self._writer("days").write((
+            _format_date(day), str(user_id),
+            daily_total.get("calories", 0), daily_total.get("protein", 0),
+            daily_total.get("fat", 0), daily_total.get("carbs", 0),
+            daily_total.get("fiber", 0), daily_total.get("calcium", 0),
+            daily_total.get("iron", 0), daily_total.get("vitamin_c", 0),
+            int(score),
+        ))
+
+    def add_shopping_list(self, day, list_id, items, prices=None):
+        """记录一份购物清单，items 为 {食材: 克数}，prices 为 {食材: 预估价格}"""
+        day = _format_date(day)
+        prices = prices or {}
+        self._writer("shopping_lists").write_many(
+            (day, str(list_id), item, grams, prices.get(item, 0.0))
+            for item, grams in items.items()
+        )
+
+    def flush(self):
+        for writer in self.writers.values():
+            writer.flush()
+
+    def close(self):
+        """写出剩余缓冲并关闭所有文件"""
+        errors = []
+        for writer in self.writers.values():
+            try:
+                writer.close()
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        return {table: writer.row_count for table, writer in self.writers.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def benchmark(n=1_000_000, output_dir="export_bench"):
+    """性能测试：批量导出合成数据"""
+    start = time.perf_counter()
+    exporter = ResultExporter(output_dir, partition_by_date=True)
+    exporter.write_rows("meals", (
+        (f"2026-01-{i % 28 + 1:02d}", f"user{i % 1000}", "午餐", 555.4, 30.2, 12.1, 70.5)
+        for i in range(n)
+    ))
+    counts = exporter.close()
+    elapsed = time.perf_counter() - start
+    print(f"📦 已导出 {counts['meals']} 行到 {output_dir}/，用时 {elapsed:.2f} 秒")
+
+
+def main():
+    # 加 --bench 参数运行性能测试
+    if "--bench" in sys.argv:
+        benchmark()
+        return
+
+    from diet_analyzer import DietAnalyzer
+    from shopping_list import ShoppingListGenerator
+
+    # 示例：导出一天的分析结果和一份购物清单
+    output_dir = "export"
+    with ResultExporter(output_dir, formats=("csv", "parquet"), partition_by_date=True) as exporter:
+        DietAnalyzer().analyze_day({
+            "早餐": [{"name": "牛奶", "grams": 250}, {"name": "鸡蛋", "grams": 50}],
+            "午餐": [{"name": "米饭", "grams": 200}, {"name": "鸡胸肉", "grams": 150}],
+        }, exporter=exporter)
+        ShoppingListGenerator().generate_from_recipes({
+            "番茄炒蛋": ["鸡蛋 3个", "番茄 2个", "油 15克"],
+        }, exporter=exporter)
+    print(f"📦 分析结果已导出到: {output_dir}/（meals、days、shopping_lists 三张表）")
+
+
+if __name__ == "__main__":
+    main()
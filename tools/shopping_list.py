@@ -5,8 +5,12 @@
 """
 
 import json
+import uuid
 from datetime import datetime
 
+from food_index import FoodIndex, load_food_names, split_items
+from report_renderer import FILE_EXTENSIONS, render_report
+
 class ShoppingListGenerator:
     def __init__(self):
         # 常见食材的单位换算
@@ -22,9 +26,40 @@ class ShoppingListGenerator:
             "茶匙": 5,     # 1茶匙 ≈ 5g/5ml
         }
         
+        # 食材分类（按名称包含的关键字匹配）
+        self.categories = {
+            "蔬菜类": ["番茄", "黄瓜", "白菜", "土豆", "胡萝卜", "青菜", "菠菜"],
+            "肉蛋类": ["鸡蛋", "鸡肉", "猪肉", "牛肉", "鱼", "虾"],
+            "主食类": ["大米", "面条", "面粉", "面包"],
+            "调料类": ["油", "盐", "糖", "酱油", "醋"],
+            "其他": []
+        }
+        
+        # 食材市场均价（元/公斤）
+        self.price_per_kg = {
+            "大米": 8,      # 8元/公斤
+            "鸡蛋": 12,     # 12元/公斤
+            "番茄": 6,      # 6元/公斤
+            "黄瓜": 5,      # 5元/公斤
+            "鸡肉": 20,     # 20元/公斤
+            "猪肉": 30,     # 30元/公斤
+            "牛肉": 80,     # 80元/公斤
+            "油": 15,       # 15元/升
+            "盐": 5,        # 5元/公斤
+            "糖": 10,       # 10元/公斤
+        }
+        
         # 保存的购物清单
         self.shopping_lists = {}
     
+    def ingredient_names(self):
+        """补全用的食材名称：共享食物数据 + 分类和价格表中的食材"""
+        names = load_food_names()
+        for patterns in self.categories.values():
+            names.extend(patterns)
+        names.extend(self.price_per_kg)
+        return names
+    
     def parse_ingredient(self, ingredient_str):
         """解析食材字符串，如：'鸡蛋 3个' -> ('鸡蛋', 150)"""
         try:
@@ -52,17 +87,11 @@ class ShoppingListGenerator:
         except:
             return ingredient_str, 1
     
-    def generate_from_recipes(self, recipes):
-        """根据多个菜谱生成购物清单"""
+    def compute_shopping_list(self, recipes):
+        """汇总食材、分类并估算价格（不输出、不保存）"""
         shopping_list = {}
         
-        print("\n🛒 智能购物清单生成器")
-        print("="*50)
-        
         for recipe_name, ingredients in recipes.items():
-            print(f"\n📝 菜谱: {recipe_name}")
-            print("  需要食材:")
-            
             for ingredient in ingredients:
                 name, grams = self.parse_ingredient(ingredient)
                 
@@ -70,78 +99,104 @@ class ShoppingListGenerator:
                     shopping_list[name] += grams
                 else:
                     shopping_list[name] = grams
-                
-                print(f"    • {ingredient}")
-        
-        print("\n" + "="*50)
-        print("📋 总计需要购买:")
-        
-        # 按类别分组显示
-        categories = {
-            "蔬菜类": ["番茄", "黄瓜", "白菜", "土豆", "胡萝卜", "青菜", "菠菜"],
-            "肉蛋类": ["鸡蛋", "鸡肉", "猪肉", "牛肉", "鱼", "虾"],
-            "主食类": ["大米", "面条", "面粉", "面包"],
-            "调料类": ["油", "盐", "糖", "酱油", "醋"],
-            "其他": []
-        }
         
+        # 按类别分组
         total_cost = 0
         category_totals = {}
+        category_items = {}
         
-        for category, items in categories.items():
-            category_items = {}
+        for category, patterns in self.categories.items():
             for item, grams in shopping_list.items():
-                for pattern in items:
+                for pattern in patterns:
                     if pattern in item:
-                        category_items[item] = grams
+                        # 估算价格（粗略估算）
+                        estimated_price = self.estimate_price(item, grams)
+                        total_cost += estimated_price
+                        
+                        if category not in category_totals:
+                            category_totals[category] = 0
+                            category_items[category] = []
+                        category_totals[category] += estimated_price
+                        
+                        category_items[category].append({
+                            "name": item,
+                            "grams": grams,
+                            "amount": self.convert_to_best_unit(grams, item),
+                            "price": estimated_price,
+                        })
                         break
+        
+        return {
+            "recipes": recipes,
+            "shopping_list": shopping_list,
+            "categories": category_items,
+            "category_totals": category_totals,
+            "total_cost": total_cost,
+            "items": self.report_items(shopping_list),
+        }
+    
+    def generate_from_recipes(self, recipes, exporter=None, day=None, writer=None, filename=None, fmt="text", quiet=False):
+        """根据多个菜谱生成购物清单；exporter 导出清单明细，writer 后台写清单，filename 指定清单路径（默认按时间命名），quiet 时不输出到控制台"""
+        result = self.compute_shopping_list(recipes)
+        shopping_list = result["shopping_list"]
+        total_cost = result["total_cost"]
+        
+        if not quiet:
+            self.print_shopping_list(result)
+        
+        # 保存购物清单
+        if writer is not None:
+            writer.submit(filename or self.report_filename(fmt), "shopping", fmt, result)
+        else:
+            self.save_shopping_list(shopping_list, total_cost, recipes, fmt, filename)
+        
+        # 批量导出（价格与预估总花费保持一致，未分类的食材不计价）
+        if exporter is not None:
+            prices = {}
+            for items in result["categories"].values():
+                for item in items:
+                    prices[item["name"]] = prices.get(item["name"], 0) + item["price"]
+            exporter.add_shopping_list(day, uuid.uuid4().hex, shopping_list, prices)
+        
+        return shopping_list
+    
+    def print_shopping_list(self, result):
+        """在控制台显示购物清单"""
+        recipes = result["recipes"]
+        total_cost = result["total_cost"]
+        
+        print("\n🛒 智能购物清单生成器")
+        print("="*50)
+        
+        for recipe_name, ingredients in recipes.items():
+            print(f"\n📝 菜谱: {recipe_name}")
+            print("  需要食材:")
             
-            if category_items:
-                print(f"\n{category}:")
-                for item, grams in category_items.items():
-                    # 估算价格（粗略估算）
-                    estimated_price = self.estimate_price(item, grams)
-                    total_cost += estimated_price
-                    
-                    if category not in category_totals:
-                        category_totals[category] = 0
-                    category_totals[category] += estimated_price
-                    
-                    # 转换为常用单位显示
-                    display_amount = self.convert_to_best_unit(grams, item)
-                    print(f"  ✓ {item}: {display_amount} ≈ {estimated_price:.2f}元")
+            for ingredient in ingredients:
+                print(f"    • {ingredient}")
+        
+        print("\n" + "="*50)
+        print("📋 总计需要购买:")
+        
+        # 按类别分组显示
+        for category, items in result["categories"].items():
+            print(f"\n{category}:")
+            for item in items:
+                print(f"  ✓ {item['name']}: {item['amount']} ≈ {item['price']:.2f}元")
         
         print("\n" + "="*50)
         print(f"💰 预估总花费: {total_cost:.2f}元")
         
         # 显示分类花费
         print("\n📊 分类花费:")
-        for category, cost in category_totals.items():
+        for category, cost in result["category_totals"].items():
             percentage = (cost / total_cost * 100) if total_cost > 0 else 0
             print(f"  {category}: {cost:.2f}元 ({percentage:.1f}%)")
-        
-        # 保存购物清单
-        self.save_shopping_list(shopping_list, total_cost, recipes)
-        
-        return shopping_list
     
     def estimate_price(self, item, grams):
         """估算食材价格（基于市场均价）"""
-        price_per_kg = {
-            "大米": 8,      # 8元/公斤
-            "鸡蛋": 12,     # 12元/公斤
-            "番茄": 6,      # 6元/公斤
-            "黄瓜": 5,      # 5元/公斤
-            "鸡肉": 20,     # 20元/公斤
-            "猪肉": 30,     # 30元/公斤
-            "牛肉": 80,     # 80元/公斤
-            "油": 15,       # 15元/升
-            "盐": 5,        # 5元/公斤
-            "糖": 10,       # 10元/公斤
-        }
-        
         # 查找匹配的价格
-        for key, price in price_per_kg.items():
+        for key, price in self.price_per_kg.items():
             if key in item:
                 return (grams / 1000) * price
         
@@ -159,28 +214,29 @@ class ShoppingListGenerator:
         else:
             return f"{grams:.0f}克"
     
-    def save_shopping_list(self, items, total_cost, recipes):
+    def report_items(self, items):
+        """购物清单明细，数量转换为常用单位"""
+        return [
+            {"name": item, "grams": grams, "amount": self.convert_to_best_unit(grams, item)}
+            for item, grams in items.items()
+        ]
+    
+    def report_filename(self, fmt="text"):
+        """按时间生成购物清单文件名"""
+        return f"shopping_list_{datetime.now().strftime('%Y%m%d_%H%M')}.{FILE_EXTENSIONS[fmt]}"
+    
+    def save_shopping_list(self, items, total_cost, recipes, fmt="text", filename=None):
         """保存购物清单到文件"""
         try:
-            filename = f"shopping_list_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
+            filename = filename or self.report_filename(fmt)
+            content = render_report("shopping", fmt, {
+                "recipes": recipes,
+                "items": self.report_items(items),
+                "total_cost": total_cost,
+            })
             
             with open(filename, "w", encoding="utf-8") as f:
-                f.write("="*50 + "\n")
-                f.write("🛒 购物清单\n")
-                f.write("="*50 + "\n\n")
-                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
-                
-                f.write("📝 菜谱:\n")
-                for recipe in recipes.keys():
-                    f.write(f"  • {recipe}\n")
-                
-                f.write("\n📋 需要购买:\n")
-                for item, grams in items.items():
-                    display_amount = self.convert_to_best_unit(grams, item)
-                    f.write(f"  ✓ {item}: {display_amount}\n")
-                
-                f.write(f"\n💰 预估总花费: {total_cost:.2f}元\n")
-                f.write("="*50 + "\n")
+                f.write(content)
             
             print(f"💾 购物清单已保存到: {filename}")
             return filename
@@ -190,8 +246,12 @@ class ShoppingListGenerator:
     
     def interactive_mode(self):
         """交互式生成购物清单"""
+        # 食材名称补全：常见食材 + 本次输入过的食材
+        index = FoodIndex(self.ingredient_names())
+        index.enable_readline()
+        
         print("🎮 交互式购物清单生成")
-        print("输入菜谱（每行一个食材，空行结束菜谱）")
+        print("输入菜谱（每行一个或多个食材，空行结束菜谱，Tab键补全）")
         print("格式示例: 鸡蛋 3个, 番茄 2个, 油 10克")
         
         recipes = {}
@@ -203,14 +263,16 @@ class ShoppingListGenerator:
             if recipe_name.lower() in ['完成', 'done', 'q', 'quit']:
                 break
             
-            print(f"请输入 {recipe_name} 的食材（每行一个，空行结束）:")
+            print(f"请输入 {recipe_name} 的食材（多个用逗号分隔，空行结束）:")
             ingredients = []
             
             while True:
-                ingredient = input("食材: ").strip()
-                if ingredient == "":
+                line = input("食材: ").strip()
+                if line == "":
                     break
-                ingredients.append(ingredient)
+                for ingredient in split_items(line):
+                    ingredients.append(ingredient)
+                    index.add(self.parse_ingredient(ingredient)[0])
             
             if ingredients:
                 recipes[recipe_name] = ingredients